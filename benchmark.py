@@ -0,0 +1,184 @@
+"""Headless benchmark of app.py over every skill x state x work type combination.
+
+    python benchmark.py                      # sweep the configured data file
+    python benchmark.py --scale 10 --scale 100 --limit 50
+    python benchmark.py --skills Sales Finance --states CA NY --no-cold
+
+Each combination is run cold (all Streamlit caches cleared first) and then
+warm, and every work type offered by the radio is clicked through. One JSON
+line per run goes to --out with latency, memory and the size of the figure
+JSON sent to the browser; a p50/p95 summary is printed at the end.
+
+Memory is traced with tracemalloc, which sees Python and NumPy/pandas
+allocations: the peak is reset before each run, so `*_peak_mb` is what that
+run allocated on top of what was already held, and `held_mb` is what stays
+allocated (mostly caches) after it. Tracing slows allocation-heavy code
+down; pass --no-memory for latencies without it. Each data file is swept in
+its own process, and the summary's peak_rss_mb is that process's peak RSS,
+which also counts what tracemalloc can't see, such as Arrow buffers.
+"""
+import argparse
+import importlib
+import json
+import multiprocessing
+import os
+import resource
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import settings
+from constants import ordered_state_abbreviations, skills_ordered
+from synthetic_data import scale_postings
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+
+
+def _mb(size):
+    return round(size / (1024 * 1024), 3)
+
+
+def use_data_path(path):
+    # app.py reads its data path from settings, so point settings at the file under test.
+    os.environ['DASHBOARD_DATA_PATH'] = path
+    importlib.reload(settings)
+
+
+def clear_caches():
+    import streamlit as st
+    import startup
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    startup.clear()
+
+
+def timed_run(at):
+    """Rerun the app, returning its latency and, while tracing, the memory it allocated at peak."""
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+        held_before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    at.run()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    peak_mb = _mb(tracemalloc.get_traced_memory()[1] - held_before) if tracing else None
+    return round(elapsed_ms, 3), peak_mb
+
+
+def held_mb():
+    return _mb(tracemalloc.get_traced_memory()[0]) if tracemalloc.is_tracing() else None
+
+
+def figure_bytes(at):
+    return sum(len(chart.proto.spec) for chart in at.get('plotly_chart'))
+
+
+def sweep(skills, states, cold=True):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_PATH, default_timeout=600)
+    at.run()
+    for skill in skills:
+        for state in states:
+            if cold:
+                clear_caches()
+            at.sidebar.selectbox(key='skill_select').set_value(skill)
+            at.sidebar.selectbox(key='state_select').set_value(state)
+            cold_ms, cold_peak_mb = timed_run(at) if cold else (None, None)
+            warm_ms, warm_peak_mb = timed_run(at)
+            yield {'kind': 'combo', 'skill': skill, 'state': state, 'work_type': None,
+                   'cold_ms': cold_ms, 'warm_ms': warm_ms, 'cold_peak_mb': cold_peak_mb,
+                   'warm_peak_mb': warm_peak_mb, 'held_mb': held_mb(), 'figure_bytes': figure_bytes(at)}
+
+            work_types = list(at.radio[0].options) if at.radio else []
+            for work_type in work_types:
+                at.radio[0].set_value(work_type)
+                warm_ms, warm_peak_mb = timed_run(at)
+                yield {'kind': 'work_type', 'skill': skill, 'state': state, 'work_type': work_type,
+                       'cold_ms': None, 'warm_ms': warm_ms, 'cold_peak_mb': None,
+                       'warm_peak_mb': warm_peak_mb, 'held_mb': held_mb(), 'figure_bytes': figure_bytes(at)}
+
+
+def bench_dataset(name, path, skills, states, cold, memory, out_path):
+    """Sweep one data file, appending its records to `out_path`; returns them and the process's peak RSS."""
+    if memory:
+        tracemalloc.start()
+    use_data_path(path)
+    records = []
+    with open(out_path, 'a') as out:
+        for record in sweep(skills, states, cold=cold):
+            record['dataset'] = name
+            records.append(record)
+            out.write(json.dumps(record) + '\n')
+            out.flush()
+    return records, round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def summarize(records):
+    frame = pd.DataFrame(records)
+    rows = []
+    for (dataset, kind), group in frame.groupby(['dataset', 'kind'], sort=False):
+        row = {'dataset': dataset, 'kind': kind, 'runs': len(group)}
+        for column in ['cold_ms', 'warm_ms']:
+            values = group[column].dropna()
+            if not values.empty:
+                row[f'{column}_p50'] = round(float(np.percentile(values, 50)), 1)
+                row[f'{column}_p95'] = round(float(np.percentile(values, 95)), 1)
+        for column in ['cold_peak_mb', 'warm_peak_mb', 'held_mb']:
+            values = group[column].dropna()
+            if not values.empty:
+                row[f'{column}_max'] = round(float(values.max()), 1)
+        row['figure_kb_mean'] = round(group['figure_bytes'].mean() / 1024, 1)
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', default=settings.DATA_PATH, help='postings CSV to benchmark')
+    parser.add_argument('--scale', type=float, action='append', default=[],
+                        help='also benchmark a synthetic copy of --data scaled by this factor (repeatable)')
+    parser.add_argument('--skills', nargs='+', default=skills_ordered)
+    parser.add_argument('--states', nargs='+', default=ordered_state_abbreviations)
+    parser.add_argument('--limit', type=int, help='only run the first N skills and states of each list')
+    parser.add_argument('--no-cold', dest='cold', action='store_false', help='skip the cold run of each combination')
+    parser.add_argument('--no-memory', dest='memory', action='store_false',
+                        help="don't trace memory, for latencies without tracemalloc's overhead")
+    parser.add_argument('--synthetic-dir', default=os.path.join(settings.CACHE_DIR, 'bench'))
+    parser.add_argument('--out', default='bench_results.jsonl')
+    args = parser.parse_args()
+
+    skills, states = args.skills[:args.limit], args.states[:args.limit]
+    datasets = [('x1', args.data)]
+    if args.scale:
+        os.makedirs(args.synthetic_dir, exist_ok=True)
+        source = pd.read_csv(args.data)
+        for factor in args.scale:
+            path = os.path.join(args.synthetic_dir, f'postings_x{factor:g}.csv')
+            if not os.path.exists(path):
+                scale_postings(source, factor).to_csv(path, index=False)
+            datasets.append((f'x{factor:g}', path))
+
+    open(args.out, 'w').close()
+    records, peak_rss_mb = [], {}
+    for name, path in datasets:
+        # A fresh process per data file: ru_maxrss never goes down, so in a shared
+        # process every file after the first would report the largest peak so far.
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+            dataset_records, peak_rss_mb[name] = pool.submit(
+                bench_dataset, name, path, skills, states, args.cold, args.memory, args.out).result()
+        records.extend(dataset_records)
+
+    summary = summarize(records)
+    summary['peak_rss_mb'] = summary['dataset'].map(peak_rss_mb)
+    with pd.option_context('display.width', 200, 'display.max_columns', 20):
+        print(summary.to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,326 @@
+import pandas as pd
+
+from constants import experience_levels, state_mapping
+from salary_distribution import APPLIES_CATEGORIES, box_statistics, salary_distribution
+from sankey import sankey_colors
+
+
+# Plotly is only imported by the *_figure functions, so code that only needs
+# the panel data (precompute.py, a warm figure cache) never loads it.
+
+
+def format_label(value):
+    if value >= 1000:
+        return f'{int(round(value/1000))}K'
+    else:
+        return f'{int(value)}'
+
+
+def map_title(selected_skill_name):
+    return f'Skill Distribution in Job Postings for {selected_skill_name} across the USA'
+
+
+def sankey_title(selected_skill_name, selected_state_abbreviation):
+    return f"Skill Distribution in Job Postings for {selected_skill_name} in {state_mapping[selected_state_abbreviation]}"
+
+
+def company_bar_title(selected_skill_name, selected_state_abbreviation, selected_work_type):
+    return (f"Top Companies for {selected_skill_name} in {state_mapping[selected_state_abbreviation]}: "
+            f"Distribution by Experience Level of {selected_work_type}")
+
+
+def top_companies_title(selected_skill_name):
+    return f"Top Companies for {selected_skill_name}"
+
+
+def salary_box_title(selected_skill_name):
+    return f"Salary Distribution by top 3 Company Size for {selected_skill_name}"
+
+
+def map_data(cube, selected_skill_name):
+    state_job_counts = cube.state_job_counts(selected_skill_name)
+
+    num_bins = 3
+    color_ranges = pd.cut(state_job_counts['job_count'], bins=num_bins, retbins=True)[1]
+
+    labels = [f'{(format_label(color_ranges[i]))} - {(format_label(color_ranges[i+1]))}' for i in range(len(color_ranges) - 1)]
+    state_job_counts['color_label'] = pd.cut(state_job_counts['job_count'],
+                                            bins=color_ranges,
+                                            labels=labels,
+                                            include_lowest=True)
+    return {'state_job_counts': state_job_counts, 'labels': labels}
+
+
+def map_figure(data, blinds_mode):
+    import plotly.express as px
+    state_job_counts = data['state_job_counts'].copy()
+    labels = data['labels']
+    if blinds_mode == 'On':
+        colors = ['#ece7f2','#a6bddb','#2b8cbe',]
+    else:
+        colors = [ '#deebf7', '#6baed6','#3182bd',]
+    color_map = {label: colors[i] for i, label in enumerate(labels)}
+
+    state_job_counts['color'] = state_job_counts['color_label'].map(color_map)
+
+    ticktext = labels
+    tickvals = list(range(len(labels)))
+
+    fig = px.choropleth(
+        state_job_counts,
+        locations='state',
+        locationmode='USA-states',
+        color='color_label',
+        scope='usa',
+        color_discrete_map=color_map,
+        labels={'job_count': 'Job Count', 'color_label': 'Job Count Range'},
+        category_orders={"color_label": labels}
+    )
+    fig.update_geos(projection_type="albers usa")
+    fig.update_traces(
+        hovertemplate='<b>%{location}</b><br>Job Count=%{customdata[0]}<extra></extra>',
+        customdata=state_job_counts[['job_count', 'state']]
+    )
+
+    fig.update_layout(coloraxis_colorbar=dict(
+        title="Open Jobs",
+        tickvals=tickvals,
+        ticktext=ticktext,
+        lenmode="pixels", len=300, yanchor="top", y=1,
+        ticks="outside"
+    ))
+    return fig
+
+
+def sankey_figure(sankey, blinds_mode):
+    import plotly.graph_objects as go
+    node_colors, link_colors = sankey_colors(sankey, blinds_mode)
+    return go.Figure(data=[go.Sankey(
+        node=dict(
+            pad=15,
+            thickness=20,
+            line=dict(color="black", width=0.5),
+            label=sankey['labels'],
+            color=node_colors
+        ),
+        link=dict(
+            source=sankey['source'],
+            target=sankey['target'],
+            value=sankey['value'],
+            color=link_colors
+        )
+    )])
+
+
+def company_bar_data(cube, selected_skill_name, selected_state_abbreviation, selected_work_type):
+    company_experience_data = cube.company_experience_counts(selected_skill_name, selected_state_abbreviation, selected_work_type)
+    top_5_companies = company_experience_data.groupby('company_name', observed=True)['job_count'].sum().nlargest(5).index
+    top_5_data = company_experience_data[company_experience_data['company_name'].isin(top_5_companies)]
+
+    return top_5_data.sort_values('job_count', ascending=False)
+
+
+def company_bar_figure(top_5_data, blinds_mode):
+    import plotly.express as px
+    if blinds_mode == 'On':
+        color_map = {
+            "Internship": "#f1eef6",
+            "Entry level": "#d0d1e6",
+            "Associate": "#a6bddb",
+            "Mid-Senior level": "#74a9cf",
+            "Director": "#2b8cbe",
+            "Executive": "#045a8d"
+        }
+
+    else:
+        color_map = {
+            "Internship": "#e7e1ef",
+            "Entry level": "#9ecae1",
+            "Associate": "#a6bddb",
+            "Mid-Senior level": "#74a9cf",
+            "Director": "#0570b0",
+            "Executive": "#023858"}
+
+    fig3 = px.bar(
+        top_5_data,
+        x='company_name',
+        y='job_count',
+        color='formatted_experience_level',
+        labels={'job_count': 'Job Count', 'company_name': 'Company', 'formatted_experience_level': 'Experience Level'},
+        barmode='stack',
+        color_discrete_map=color_map,
+        category_orders={'formatted_experience_level': experience_levels},
+        hover_data={'company_name': False}
+    )
+
+    fig3.update_layout(
+        xaxis=dict(
+            title='Company',
+            tickangle=-45,
+            automargin=True,
+        ),
+        yaxis=dict(
+            title='Job Count',
+            range=[0, top_5_data['job_count'].max() + 10]
+        )
+
+    )
+    return fig3
+
+
+def top_companies_data(cube, selected_skill_name, selected_state_abbreviation):
+    """Top companies for the chart shown when no work type can be charted.
+
+    When a single company posts the skill, the skill's share of all postings
+    is shown as a pie instead.
+    """
+    if cube.count(skill=selected_skill_name, state=selected_state_abbreviation) > 0:
+        top_5_companies = cube.top_companies(selected_skill_name, selected_state_abbreviation)
+    else:
+        top_5_companies = cube.top_companies(selected_skill_name)
+
+    if len(top_5_companies) == 1:
+        selected_skill_count = cube.count(skill=selected_skill_name)
+        total_job_postings = cube.count() - selected_skill_count
+        pie_data = pd.DataFrame({
+            'Category': [selected_skill_name, 'Others'],
+            'Job Postings': [selected_skill_count, total_job_postings - selected_skill_count]
+        })
+        return {'kind': 'pie', 'skill': selected_skill_name, 'pie_data': pie_data}
+
+    top_5_data = pd.DataFrame({'company_name': top_5_companies.index, 'job_postings': top_5_companies.values})
+    return {'kind': 'bar', 'skill': selected_skill_name, 'top_5_data': top_5_data}
+
+
+def top_companies_figure(data):
+    import plotly.express as px
+    if data['kind'] == 'pie':
+        fig_pie = px.pie(
+        data['pie_data'],
+        names='Category',
+        values='Job Postings',
+        labels={'Job Postings': 'Number of Job Postings'},
+        color_discrete_sequence=['#9ecae1', '#0570b0'])
+
+        fig_pie.update_layout(
+            title=f"Job Postings Distribution for {data['skill']}")
+        return fig_pie
+
+    fig_fallback = px.bar(
+        data['top_5_data'],
+        x='company_name',
+        y='job_postings',
+        labels={'job_postings': 'Job Postings', 'company_name': 'Company'},
+        color_discrete_sequence=['#0570b0'])
+
+    fig_fallback.update_layout(
+        xaxis=dict(title='Company', tickangle=-45, automargin=True),
+        yaxis=dict(title='Job Postings')
+    )
+    return fig_fallback
+
+
+def salary_box_data(index, selected_skill_name, box_stats_mode='client'):
+    """Expanded salaries (or, in 'server' mode, only their box statistics) for the salary chart."""
+    df_expanded, company_size_sorted = salary_distribution(index.rows(skill=selected_skill_name))
+    data = {'mode': box_stats_mode, 'company_size_sorted': company_size_sorted,
+            'salary_max': df_expanded['salary'].max()}
+    if box_stats_mode == 'server':
+        data['stats'] = box_statistics(df_expanded)
+    else:
+        data['df_expanded'] = df_expanded
+    return data
+
+
+def salary_box_figure(data, blinds_mode):
+    import plotly.express as px
+    import plotly.graph_objects as go
+    company_size_sorted = data['company_size_sorted']
+    if blinds_mode == 'On':
+        applies_colors = {
+            'No\nApplications': '#ece7f2',
+            'Average\nApplications': '#a6bddb',
+            'Above Average\nApplications': '#2b8cbe'
+        }
+    else:
+        applies_colors = {
+            'No\nApplications': '#9ecae1',
+            'Average\nApplications': '#4292c6',
+            'Above Average\nApplications': '#08306b'
+        }
+
+    if data['mode'] == 'server':
+        stats = data['stats']
+        fig = go.Figure()
+        for category in APPLIES_CATEGORIES:
+            category_stats = stats[stats['applies_category'] == category]
+            if category_stats.empty:
+                continue
+            fig.add_trace(go.Box(
+                name=category,
+                x=category_stats['company_size_label'].astype(str).tolist(),
+                q1=category_stats['q1'], median=category_stats['median'], q3=category_stats['q3'],
+                lowerfence=category_stats['lowerfence'], upperfence=category_stats['upperfence'],
+                # Set but not drawn: px.box in client mode doesn't draw the mean either.
+                mean=category_stats['mean'], boxmean=False,
+                marker_color=applies_colors[category],
+                offsetgroup=category))
+        fig.update_layout(
+            boxmode='group',
+            legend_title_text='Applies Category',
+            xaxis=dict(categoryorder='array', categoryarray=company_size_sorted))
+    else:
+        fig = px.box(data['df_expanded'], x='company_size_label', y='salary', color='applies_category',
+                    labels={'company_size_label': 'Company Size', 'salary': 'Salary', 'applies_category': 'Applies Category'},
+                    color_discrete_map=applies_colors,
+                    category_orders={'company_size_label': company_size_sorted,
+                                    'applies_category': APPLIES_CATEGORIES},
+                    points=False)
+    fig.update_layout(
+        xaxis_title='Company Size',
+        yaxis_title='Salary',
+        xaxis_tickangle=-45,
+        showlegend=True,
+        height=600,
+        width=800,
+        yaxis_range=[0, data['salary_max'] + 20000]
+    )
+    return fig
+
+
+def sidebar_summary(cube, selected_skill_name, selected_state_abbreviation):
+    """Salary statistics, posting count and top companies shown in the sidebar.
+
+    Falls back to the skill across all states when the state has no postings
+    for it; `scoped_to_state` tells which one was used.
+    """
+    scoped_to_state = cube.count(skill=selected_skill_name, state=selected_state_abbreviation) > 0
+    state = selected_state_abbreviation if scoped_to_state else None
+    summary = cube.salary_stats(selected_skill_name, state)
+    summary['scoped_to_state'] = scoped_to_state
+    summary['top_companies'] = [[str(company), int(count)]
+                                for company, count in cube.top_companies(selected_skill_name, state).items()]
+    return summary
+
+
+def sidebar_lines(summary, selected_skill_name, selected_state_abbreviation):
+    """The sidebar text for a sidebar_summary() as ('subheader' | 'text', text) pairs."""
+    if summary['scoped_to_state']:
+        stats_title = f'Salary Statistics for {selected_skill_name} in {selected_state_abbreviation}'
+        count_title = f'Number of Job Postings for {selected_skill_name} in {selected_state_abbreviation}'
+        companies_title = f'Top Companies in {selected_state_abbreviation} for {selected_skill_name}'
+    else:
+        stats_title = f'Salary Statistics for {selected_skill_name}'
+        count_title = f'Number of Job Postings in {selected_skill_name}'
+        companies_title = f'Top Companies in {selected_skill_name}'
+    lines = [
+        ('subheader', stats_title),
+        ('text', f"Minimum Salary: ${summary['min_salary']:,.2f}"),
+        ('text', f"Average Salary: ${summary['avg_salary']:,.2f}"),
+        ('text', f"Maximum Salary: ${summary['max_salary']:,.2f}"),
+        ('subheader', count_title),
+        ('text', f"Total: {summary['job_count']}"),
+        ('subheader', companies_title),
+    ]
+    lines += [('text', f"{company}: {count} job postings") for company, count in summary['top_companies']]
+    return lines
@@ -0,0 +1,46 @@
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Settings are read at import, so this has to run before the tests import them:
+# keep the Parquet caches the tests write out of the working tree.
+os.environ.setdefault('DASHBOARD_CACHE_DIR', tempfile.mkdtemp(prefix='dashboard-test-cache-'))
+
+SKILLS = ['Sales', 'Legal']
+STATES = ['CA', 'NY', 'TX']
+
+
+def make_postings(seed, n, gaps=False):
+    """`n` random postings with the data file's columns, in its column order.
+
+    With `gaps`, some salaries, applies and company sizes are missing and
+    every fifth posting has no applies, as in the source data.
+    """
+    rng = np.random.default_rng(seed)
+    min_salary = rng.integers(30, 120, n) * 1000.0
+    max_salary = min_salary + rng.integers(0, 60, n) * 1000.0
+    applies = rng.integers(0, 40, n).astype(float)
+    company_size = rng.integers(1, 8, n).astype(float)
+    if gaps:
+        min_salary[::17] = np.nan
+        max_salary[::23] = np.nan
+        applies[::5] = 0
+        applies[::29] = np.nan
+        # A size with no label.
+        company_size[::31] = np.nan
+    postings = pd.DataFrame({
+        'skill_name': rng.choice(SKILLS, n),
+        'state': rng.choice(STATES, n),
+        'company_name': rng.choice(['Acme', 'Globex', 'Initech'], n),
+        'formatted_work_type': rng.choice(['Full-time', 'Contract'], n),
+        'formatted_experience_level': rng.choice(['Entry level', 'Director'], n),
+        'company_size': company_size,
+        'min_salary': min_salary,
+        'max_salary': max_salary,
+        'applies': applies,
+    })
+    # Not imported at the top: data_loader reads the settings, which must see the cache dir first.
+    from data_loader import SOURCE_COLUMNS
+    return postings[SOURCE_COLUMNS]
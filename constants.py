@@ -0,0 +1,44 @@
+state_mapping = {
+    'NJ': 'New Jersey', 'IL': 'Illinois', 'NY': 'New York', 'CA': 'California', 'PA': 'Pennsylvania', 
+    'WI': 'Wisconsin', 'WA': 'Washington', 'NC': 'North Carolina', 'OH': 'Ohio', 'GA': 'Georgia', 
+    'KY': 'Kentucky', 'FL': 'Florida', 'MD': 'Maryland', 'TX': 'Texas', 'VA': 'Virginia', 
+    'MI': 'Michigan', 'SD': 'South Dakota', 'IN': 'Indiana', 'NE': 'Nebraska', 'MO': 'Missouri', 
+    'MA': 'Massachusetts', 'TN': 'Tennessee', 'LA': 'Louisiana', 'DC': 'District of Columbia', 
+    'AR': 'Arkansas', 'OK': 'Oklahoma', 'UT': 'Utah', 'MN': 'Minnesota', 'AZ': 'Arizona', 'CT': 'Connecticut', 
+    'RI': 'Rhode Island', 'ME': 'Maine', 'NH': 'New Hampshire', 'CO': 'Colorado', 'AL': 'Alabama', 
+    'KS': 'Kansas', 'ID': 'Idaho', 'HI': 'Hawaii', 'OR': 'Oregon', 'NV': 'Nevada', 'NM': 'New Mexico', 
+    'VT': 'Vermont', 'IA': 'Iowa', 'SC': 'South Carolina', 'DE': 'Delaware', 'ND': 'North Dakota', 
+    'MS': 'Mississippi', 'WY': 'Wyoming', 'MT': 'Montana', 'AK': 'Alaska'
+}
+ordered_states = [
+    "California", "New York", "Virginia", "New Jersey", "Washington", "Illinois",
+    "Massachusetts", "Texas", "Ohio", "Nebraska", "Alabama", "Alaska", "Arizona",
+    "Arkansas", "Colorado", "Connecticut", "Delaware", "District of Columbia", "Hawaii",
+    "Idaho", "Indiana", "Iowa", "Kansas", "Kentucky", "Louisiana", "Maine", "Michigan",
+    "Mississippi", "Missouri", "Montana", "Nevada", "New Hampshire", "New Mexico",
+    "North Dakota", "Oklahoma", "Oregon", "Rhode Island", "Tennessee", "Wyoming",
+    "Maryland", "Pennsylvania", "Florida", "North Carolina", "Utah", "South Dakota",
+    "Minnesota", "Wisconsin", "Georgia", "South Carolina"
+]
+skills_ordered = ["Information Technology","Accounting/Auditing","Engineering","Finance","Sales","Health Care Provider","Management","Manufacturing",
+    "Administrative","Business Development","Product Management","Supply Chain","Production","Public Relations","Science","Strategy/Planning","Research",
+    "Quality Assurance","Advertising","Writing/Editing","Purchasing","Training","Education","Distribution","Legal","Marketing","Project Management",
+    "Analyst","Design","Customer Service","Human Resources","General Business","Consulting","Art/Creative"]
+
+# Reverse mapping for filtering purposes
+reverse_state_mapping = {v: k for k, v in state_mapping.items()}
+ordered_state_abbreviations = [reverse_state_mapping[state] for state in ordered_states if state in reverse_state_mapping]
+
+# Company size mapping
+company_size_mapping = {
+    1.0: '2-50 employees',
+    2.0: '51-200 employees',
+    3.0: '201-500 employees',
+    4.0: '501-1000 employees',
+    5.0: '1001-5000 employees',
+    6.0: '5001-10,000 employees',
+    7.0: '10,001+ employees'
+    }
+company_size_order = list(company_size_mapping.values())
+
+experience_levels = ["Internship", "Entry level", "Associate", "Mid-Senior level", "Director", "Executive"]
@@ -0,0 +1,183 @@
+import argparse
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from constants import company_size_mapping, company_size_order, state_mapping
+from settings import CACHE_DIR, DATA_PATH
+
+CATEGORICAL_COLUMNS = ['skill_name', 'state', 'company_name', 'formatted_work_type', 'formatted_experience_level']
+NUMERIC_COLUMNS = ['min_salary', 'max_salary', 'applies']
+# The only source columns the dashboard reads; company_size is replaced by company_size_label.
+SOURCE_COLUMNS = CATEGORICAL_COLUMNS + ['company_size'] + NUMERIC_COLUMNS
+
+# Bump whenever the derived columns change so stale caches get rebuilt.
+CACHE_VERSION = 2
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for chunk in iter(lambda: source.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def add_derived_columns(df):
+    df['company_size_label'] = pd.Categorical(
+        df['company_size'].map(company_size_mapping), categories=company_size_order, ordered=True)
+    return df
+
+
+def _downcast(series):
+    if pd.api.types.is_integer_dtype(series):
+        return pd.to_numeric(series, downcast='integer')
+    narrow = series.astype('float32')
+    if ((narrow.astype('float64') == series) | series.isna()).all():
+        return narrow
+    return series
+
+
+def compact_postings(df):
+    """Keep only the columns the dashboard uses, as categoricals and the narrowest lossless numeric dtypes.
+
+    State names are looked up from constants.state_mapping when needed
+    rather than stored per row.
+    """
+    df = df[CATEGORICAL_COLUMNS + ['company_size_label'] + NUMERIC_COLUMNS].copy()
+    for column in CATEGORICAL_COLUMNS:
+        if not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype('category')
+    for column in NUMERIC_COLUMNS:
+        df[column] = _downcast(pd.to_numeric(df[column], errors='coerce'))
+    return df
+
+
+def memory_report(before, after):
+    """Bytes used per column before and after compaction, with a total row."""
+    report = pd.DataFrame({
+        'dtype_before': before.dtypes.astype(str),
+        'bytes_before': before.memory_usage(deep=True, index=False),
+        'dtype_after': after.dtypes.astype(str),
+        'bytes_after': after.memory_usage(deep=True, index=False),
+    })
+    report[['dtype_before', 'dtype_after']] = report[['dtype_before', 'dtype_after']].fillna('-')
+    report[['bytes_before', 'bytes_after']] = report[['bytes_before', 'bytes_after']].fillna(0).astype('int64')
+    report.loc['total'] = ['', report['bytes_before'].sum(), '', report['bytes_after'].sum()]
+    return report
+
+
+def concat_postings(frames):
+    """Stack postings frames, merging their categories so categorical columns stay categorical.
+
+    Categories are kept sorted, so the result matches what read_postings would
+    return for the concatenated CSVs.
+    """
+    columns = {}
+    for column in frames[0].columns:
+        parts = [frame[column] for frame in frames]
+        dtype = parts[0].dtype
+        if isinstance(dtype, pd.CategoricalDtype) and not dtype.ordered:
+            categories = parts[0].cat.categories
+            for part in parts[1:]:
+                categories = categories.union(part.cat.categories)
+            parts = [part.cat.set_categories(categories) for part in parts]
+        columns[column] = pd.concat(parts, ignore_index=True)
+    return pd.DataFrame(columns)
+
+
+def batch_paths(ingest_dir):
+    """CSV batches in the drop directory, in name order.
+
+    Dot-files are skipped, so a writer can upload under a dot-name and rename
+    the finished batch in.
+    """
+    if not ingest_dir or not os.path.isdir(ingest_dir):
+        return []
+    names = sorted(name for name in os.listdir(ingest_dir) if name.endswith('.csv') and not name.startswith('.'))
+    return [os.path.join(ingest_dir, name) for name in names]
+
+
+def read_postings(path):
+    df = pd.read_csv(path, usecols=SOURCE_COLUMNS, dtype={column: 'category' for column in CATEGORICAL_COLUMNS})
+    return compact_postings(add_derived_columns(df))
+
+
+def _cache_paths(path, cache_dir):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f'{stem}.parquet'), os.path.join(cache_dir, f'{stem}.json')
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path) as meta_file:
+            return json.load(meta_file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_meta(meta_path, meta):
+    tmp_path = f'{meta_path}.tmp'
+    with open(tmp_path, 'w') as meta_file:
+        json.dump(meta, meta_file)
+    os.replace(tmp_path, meta_path)
+
+
+def load_postings(path=DATA_PATH, cache_dir=CACHE_DIR):
+    """Return the postings frame with derived columns, going through a Parquet cache.
+
+    The cache is reused while the source file's mtime and size are unchanged. If
+    the mtime moved but the content hash is the same (e.g. a fresh checkout) the
+    cache is kept and only the metadata is refreshed; otherwise the CSV is parsed
+    again and the cache rewritten.
+    """
+    stat = os.stat(path)
+    cache_path, meta_path = _cache_paths(path, cache_dir)
+    meta = _read_meta(meta_path)
+    fresh = (meta.get('version') == CACHE_VERSION and os.path.exists(cache_path)
+             and meta.get('size') == stat.st_size)
+
+    if fresh and meta.get('mtime_ns') != stat.st_mtime_ns:
+        source_hash = file_hash(path)
+        fresh = meta.get('sha256') == source_hash
+        if fresh:
+            meta['mtime_ns'] = stat.st_mtime_ns
+            _write_meta(meta_path, meta)
+
+    if fresh:
+        try:
+            return pd.read_parquet(cache_path)
+        except (ImportError, OSError, ValueError):
+            pass
+
+    df = read_postings(path)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f'{cache_path}.tmp'
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, cache_path)
+        _write_meta(meta_path, {'version': CACHE_VERSION, 'mtime_ns': stat.st_mtime_ns,
+                                'size': stat.st_size, 'sha256': file_hash(path)})
+    except (ImportError, OSError):
+        # pyarrow missing or cache dir not writable: serve the parsed frame uncached.
+        pass
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the memory used by the raw and the compacted postings frame.')
+    parser.add_argument('path', nargs='?', default=DATA_PATH)
+    args = parser.parse_args()
+
+    # What app.py used to hold per frame: every CSV column as parsed, plus the derived columns.
+    raw = pd.read_csv(args.path)
+    raw['state_full_name'] = raw['state'].replace(state_mapping)
+    raw['company_size_label'] = raw['company_size'].map(company_size_mapping)
+    with pd.option_context('display.width', 200):
+        print(memory_report(raw, read_postings(args.path)).to_string())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+import os
+import threading
+import time
+import warnings
+
+from data_loader import batch_paths, concat_postings, load_postings
+from duckdb_backend import DuckDBPostings, duckdb
+from job_cube import JobCube
+from settings import BACKEND, CACHE_DIR, DATA_PATH, INGEST_DIR
+from slice_index import SliceIndex
+
+# Batches get their own Parquet cache so their names can't clash with the main file's.
+BATCH_CACHE_DIR = os.path.join(CACHE_DIR, 'batches')
+# What reading a malformed batch raises; such a batch is skipped with a warning.
+BATCH_ERRORS = (OSError, ValueError) + ((duckdb.Error,) if duckdb is not None else ())
+
+
+class Dataset:
+    """The postings, their SliceIndex and JobCube, loaded once and shared read-only.
+
+    One instance per data file version is shared by every session and thread
+    of the server. The postings are only reachable through `index` and
+    `cube`, which keep their frames private and answer every query with a
+    new frame, array or scalar, so what a session does with an answer never
+    reaches the shared copy. Ingesting a batch builds a new Dataset instead
+    of changing this one; the two share every frame but the batch's.
+    """
+
+    def __init__(self, index, cube, path, mtime_ns, batches=()):
+        self._index = index
+        self._cube = cube
+        self._batches = tuple(batches)
+        self._version = (path, mtime_ns, len(self._batches))
+
+    @property
+    def index(self):
+        return self._index
+
+    @property
+    def cube(self):
+        return self._cube
+
+    @property
+    def batches(self):
+        return self._batches
+
+    @property
+    def version(self):
+        # Changes whenever the data does; panel caches are keyed by it.
+        return self._version
+
+    @property
+    def row_count(self):
+        return self.index.count()
+
+    def append(self, batch_path):
+        """Return a new Dataset that also holds the postings batch at `batch_path`.
+
+        The batch is parsed once into the batch Parquet cache, then only its
+        rows are grouped and merged into the existing SliceIndex and JobCube.
+        The postings already loaded aren't copied; see SliceIndex.extend for
+        the batch rows that are.
+        """
+        path, mtime_ns, _ = self.version
+        batches = self.batches + (os.path.basename(batch_path),)
+        if isinstance(self._cube, DuckDBPostings):
+            postings = self._cube.append(batch_path, BATCH_CACHE_DIR)
+            return Dataset(postings, postings, path, mtime_ns, batches)
+
+        batch = load_postings(batch_path, BATCH_CACHE_DIR)
+        return Dataset(self._index.extend(batch), self._cube.append(batch), path, mtime_ns, batches)
+
+
+def _skip_batch(batch_path, error):
+    warnings.warn(f'Skipping postings batch {batch_path}: {error}')
+
+
+def load_dataset(path=DATA_PATH, backend=BACKEND, ingest_dir=INGEST_DIR):
+    """Load the main data file plus every batch already in `ingest_dir`."""
+    mtime_ns = os.stat(path).st_mtime_ns
+    if backend == 'duckdb':
+        # Nothing is held in pandas; the same object answers index and cube queries.
+        postings = DuckDBPostings.from_source(path)
+        dataset = Dataset(postings, postings, path, mtime_ns)
+        for batch_path in batch_paths(ingest_dir):
+            try:
+                dataset = dataset.append(batch_path)
+            except BATCH_ERRORS as error:
+                _skip_batch(batch_path, error)
+        return dataset
+
+    # All batches are stacked in one go rather than appended one at a time.
+    frames, names = [load_postings(path)], []
+    for batch_path in batch_paths(ingest_dir):
+        try:
+            frames.append(load_postings(batch_path, BATCH_CACHE_DIR))
+        except BATCH_ERRORS as error:
+            _skip_batch(batch_path, error)
+            continue
+        names.append(os.path.basename(batch_path))
+    frame = concat_postings(frames) if names else frames[0]
+    return Dataset(SliceIndex(frame), JobCube.from_postings(frame), path, mtime_ns, names)
+
+
+class LiveDataset:
+    """The current Dataset of a data file, kept up to date from the drop directory.
+
+    `poll()` appends the batches that appeared in `ingest_dir` since the last
+    check and swaps in the resulting Dataset. Readers keep whichever snapshot
+    they got, so a rerun never sees half an ingest. Checks closer together
+    than `interval` seconds, or while another thread is ingesting, just
+    return the current snapshot, so every session can poll on every rerun.
+    """
+
+    def __init__(self, dataset, ingest_dir=INGEST_DIR, interval=5.0):
+        self.current = dataset
+        self.ingest_dir = ingest_dir
+        self.interval = interval
+        self.rejected = set()
+        self._lock = threading.Lock()
+        self._checked = time.monotonic()
+
+    def poll(self):
+        if not self.ingest_dir or time.monotonic() - self._checked < self.interval:
+            return self.current
+        if not self._lock.acquire(blocking=False):
+            return self.current
+        try:
+            self._checked = time.monotonic()
+            dataset = self.current
+            for batch_path in batch_paths(self.ingest_dir):
+                # Batches are append-only: one already ingested is never read again.
+                name = os.path.basename(batch_path)
+                if name in dataset.batches or name in self.rejected:
+                    continue
+                try:
+                    dataset = dataset.append(batch_path)
+                except BATCH_ERRORS as error:
+                    # Skip a malformed batch once instead of failing every session's rerun.
+                    self.rejected.add(name)
+                    _skip_batch(batch_path, error)
+            self.current = dataset
+        finally:
+            self._lock.release()
+        return self.current
@@ -0,0 +1,147 @@
+import os
+
+import pandas as pd
+
+from constants import company_size_mapping, company_size_order
+from data_loader import SOURCE_COLUMNS
+from settings import CACHE_DIR
+
+try:
+    import duckdb
+except ImportError:  # optional: only needed for DASHBOARD_BACKEND=duckdb
+    duckdb = None
+
+
+def ensure_parquet(path, cache_dir=CACHE_DIR):
+    """Return a Parquet copy of the postings, converting a CSV with DuckDB if needed.
+
+    The conversion streams through DuckDB, so the CSV never has to fit in
+    memory. It is redone when the CSV is newer than its Parquet copy.
+    """
+    if path.endswith('.parquet'):
+        return path
+    stem = os.path.splitext(os.path.basename(path))[0]
+    parquet_path = os.path.join(cache_dir, f'{stem}.duckdb.parquet')
+    if not os.path.exists(parquet_path) or os.path.getmtime(parquet_path) < os.path.getmtime(path):
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f'{parquet_path}.tmp'
+        duckdb.execute(f"COPY (SELECT * FROM read_csv_auto(?)) TO {_quote(tmp_path)} (FORMAT PARQUET)", [path])
+        os.replace(tmp_path, parquet_path)
+    return parquet_path
+
+
+def _quote(path):
+    return "'" + path.replace("'", "''") + "'"
+
+
+def _float(value):
+    return float(value) if pd.notna(value) else float('nan')
+
+
+def _where(skill=None, state=None):
+    clauses, params = [], []
+    for column, value in [('skill_name', skill), ('state', state)]:
+        if value is not None:
+            clauses.append(f'{column} = ?')
+            params.append(value)
+    return (' WHERE ' + ' AND '.join(clauses) if clauses else ''), params
+
+
+class DuckDBPostings:
+    """Answers the same queries as JobCube (and SliceIndex.rows/count) with SQL over Parquet.
+
+    Filters and aggregations run inside DuckDB against the Parquet file, so
+    only the small per-panel results are materialized in pandas. Each query
+    uses its own cursor, which makes the object safe to share between
+    sessions and threads.
+    """
+
+    def __init__(self, parquet_paths):
+        if duckdb is None:
+            raise ImportError('The duckdb backend needs the duckdb package: pip install duckdb')
+        if isinstance(parquet_paths, str):
+            parquet_paths = [parquet_paths]
+        self.parquet_paths = tuple(parquet_paths)
+        files = ', '.join(_quote(path) for path in self.parquet_paths)
+        self._con = duckdb.connect()
+        self._con.execute(f'CREATE VIEW postings AS SELECT * FROM read_parquet([{files}], union_by_name = true)')
+
+    @classmethod
+    def from_source(cls, path, cache_dir=CACHE_DIR):
+        if duckdb is None:
+            raise ImportError('The duckdb backend needs the duckdb package: pip install duckdb')
+        return cls(ensure_parquet(path, cache_dir))
+
+    def append(self, path, cache_dir=CACHE_DIR):
+        """Return a new instance whose view also covers the postings in `path`."""
+        parquet_path = ensure_parquet(path, cache_dir)
+        columns = self._query(f'DESCRIBE SELECT * FROM read_parquet({_quote(parquet_path)})')['column_name']
+        missing = sorted(set(SOURCE_COLUMNS) - set(columns))
+        if missing:
+            raise ValueError(f'{path} is missing columns {missing}')
+        return DuckDBPostings(self.parquet_paths + (parquet_path,))
+
+    def _query(self, sql, params=()):
+        return self._con.cursor().execute(sql, list(params)).df()
+
+    def count(self, skill=None, state=None):
+        where, params = _where(skill, state)
+        return int(self._query(f'SELECT count(*) AS n FROM postings{where}', params)['n'].iloc[0])
+
+    def rows(self, skill=None, state=None):
+        where, params = _where(skill, state)
+        rows = self._query(f'SELECT company_size, min_salary, max_salary, applies FROM postings{where}', params)
+        rows['company_size_label'] = pd.Categorical(
+            rows['company_size'].map(company_size_mapping), categories=company_size_order, ordered=True)
+        return rows
+
+    def state_job_counts(self, skill):
+        return self._query(
+            'SELECT state, count(*) AS job_count FROM postings WHERE skill_name = ? AND state IS NOT NULL '
+            'GROUP BY state ORDER BY state', [skill])
+
+    def top_skills(self, state, n=5, exclude='other'):
+        return self._query(
+            'SELECT skill_name, count(*) AS n FROM postings WHERE state = ? AND skill_name IS NOT NULL AND skill_name <> ? '
+            'GROUP BY skill_name ORDER BY n DESC, skill_name LIMIT ?', [state, exclude, n])['skill_name'].tolist()
+
+    def skill_experience_counts(self, state, skills):
+        if not skills:
+            return pd.DataFrame(columns=['skill_name', 'formatted_experience_level', 'count'])
+        return self._query(
+            'SELECT skill_name, formatted_experience_level, count(*) AS count FROM postings '
+            'WHERE state = ? AND list_contains(?, skill_name) AND formatted_experience_level IS NOT NULL '
+            'GROUP BY ALL ORDER BY skill_name, formatted_experience_level', [state, list(skills)])
+
+    def work_types(self, skill, state, min_companies=2):
+        return self._query(
+            'SELECT formatted_work_type FROM postings WHERE skill_name = ? AND state = ? AND formatted_work_type IS NOT NULL '
+            'GROUP BY formatted_work_type HAVING count(DISTINCT company_name) >= ? '
+            'ORDER BY count(*) DESC, formatted_work_type', [skill, state, min_companies])['formatted_work_type'].tolist()
+
+    def company_experience_counts(self, skill, state, work_type):
+        return self._query(
+            'SELECT company_name, formatted_experience_level, count(*) AS job_count FROM postings '
+            'WHERE skill_name = ? AND state = ? AND formatted_work_type = ? '
+            'AND company_name IS NOT NULL AND formatted_experience_level IS NOT NULL '
+            'GROUP BY ALL ORDER BY company_name, formatted_experience_level', [skill, state, work_type])
+
+    def top_companies(self, skill, state=None, n=5):
+        where, params = _where(skill, state)
+        counts = self._query(
+            f'SELECT company_name, count(*) AS n FROM postings{where} AND company_name IS NOT NULL '
+            'GROUP BY company_name ORDER BY n DESC, company_name LIMIT ?', params + [n])
+        return pd.Series(counts['n'].to_numpy(), index=pd.Index(counts['company_name'], name='company_name'), name='job_count')
+
+    def salary_stats(self, skill, state=None):
+        where, params = _where(skill, state)
+        stats = self._query(
+            'SELECT min(min_salary) AS min_salary, max(max_salary) AS max_salary, '
+            f'avg(min_salary + max_salary) / 2 AS avg_salary, count(*) AS job_count FROM postings{where}', params)
+        stats = stats.iloc[0]
+        return {
+            'min_salary': _float(stats['min_salary']),
+            'max_salary': _float(stats['max_salary']),
+            'avg_salary': _float(stats['avg_salary']),
+            'job_count': int(stats['job_count']),
+        }
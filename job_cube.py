@@ -0,0 +1,111 @@
+import pandas as pd
+
+from data_loader import concat_postings
+from slice_index import SliceIndex
+
+DIMENSIONS = ['skill_name', 'state', 'formatted_work_type', 'formatted_experience_level', 'company_name']
+
+
+def _sort_counts(counts):
+    return counts[counts > 0].sort_values(ascending=False, kind='stable')
+
+
+class JobCube:
+    """Job counts and salary aggregates over skill x state x work type x experience x company.
+
+    One row ("cell") per observed combination of DIMENSIONS, with the number
+    of postings, the salary extremes and the sum/count of (min + max) salary
+    pairs so averages can be rebuilt. The panels ask the cube instead of
+    grouping the raw postings, so an interaction only touches a handful of
+    cells found through the cube's own SliceIndex. The cells stay private;
+    every method returns a new object built from them.
+    """
+
+    def __init__(self, cells):
+        self._cells = cells
+        self._index = SliceIndex(cells)
+
+    @classmethod
+    def from_postings(cls, df):
+        # Salaries may be stored as float32; aggregate them in float64.
+        min_salary = df['min_salary'].astype('float64')
+        max_salary = df['max_salary'].astype('float64')
+        salary_pair = min_salary + max_salary
+        frame = df[DIMENSIONS].assign(
+            min_salary=min_salary,
+            max_salary=max_salary,
+            salary_sum=salary_pair,
+            salary_count=salary_pair.notna(),
+        )
+        cells = frame.groupby(DIMENSIONS, observed=True, dropna=False).agg(
+            job_count=('min_salary', 'size'),
+            min_salary=('min_salary', 'min'),
+            max_salary=('max_salary', 'max'),
+            salary_sum=('salary_sum', 'sum'),
+            salary_count=('salary_count', 'sum'),
+        ).reset_index()
+        return cls(cells)
+
+    def append(self, df):
+        """Return a new cube that also counts the postings in `df`.
+
+        Only the new postings are grouped; their cells are then folded into the
+        existing ones, so the cost follows the batch and the number of cells
+        rather than every posting seen so far.
+        """
+        cells = concat_postings([self._cells, JobCube.from_postings(df)._cells])
+        cells = cells.groupby(DIMENSIONS, observed=True, dropna=False).agg(
+            job_count=('job_count', 'sum'),
+            min_salary=('min_salary', 'min'),
+            max_salary=('max_salary', 'max'),
+            salary_sum=('salary_sum', 'sum'),
+            salary_count=('salary_count', 'sum'),
+        ).reset_index()
+        return JobCube(cells)
+
+    def count(self, skill=None, state=None):
+        return int(self._index.rows(skill, state)['job_count'].sum())
+
+    def state_job_counts(self, skill):
+        cells = self._index.rows(skill=skill)
+        counts = cells.groupby('state', observed=True)['job_count'].sum()
+        return counts[counts > 0].reset_index()
+
+    def top_skills(self, state, n=5, exclude='other'):
+        cells = self._index.rows(state=state)
+        counts = _sort_counts(cells.groupby('skill_name', observed=True)['job_count'].sum())
+        return counts[counts.index != exclude].head(n).index.tolist()
+
+    def skill_experience_counts(self, state, skills):
+        cells = self._index.rows(state=state)
+        cells = cells[cells['skill_name'].isin(skills)]
+        counts = cells.groupby(['skill_name', 'formatted_experience_level'], observed=True)['job_count'].sum()
+        return counts[counts > 0].reset_index(name='count')
+
+    def work_types(self, skill, state, min_companies=2):
+        cells = self._index.rows(skill=skill, state=state)
+        grouped = cells.groupby('formatted_work_type', observed=True)
+        work_types = pd.DataFrame({'companies': grouped['company_name'].nunique(),
+                                   'job_count': grouped['job_count'].sum()})
+        work_types = work_types[work_types['companies'] >= min_companies]
+        return work_types.sort_values('job_count', ascending=False, kind='stable').index.tolist()
+
+    def company_experience_counts(self, skill, state, work_type):
+        cells = self._index.rows(skill=skill, state=state)
+        cells = cells[cells['formatted_work_type'] == work_type]
+        counts = cells.groupby(['company_name', 'formatted_experience_level'], observed=True)['job_count'].sum()
+        return counts[counts > 0].reset_index(name='job_count')
+
+    def top_companies(self, skill, state=None, n=5):
+        cells = self._index.rows(skill=skill, state=state)
+        return _sort_counts(cells.groupby('company_name', observed=True)['job_count'].sum()).head(n)
+
+    def salary_stats(self, skill, state=None):
+        cells = self._index.rows(skill=skill, state=state)
+        salary_count = cells['salary_count'].sum()
+        return {
+            'min_salary': cells['min_salary'].min(),
+            'max_salary': cells['max_salary'].max(),
+            'avg_salary': cells['salary_sum'].sum() / salary_count / 2 if salary_count else float('nan'),
+            'job_count': int(cells['job_count'].sum()),
+        }
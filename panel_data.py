@@ -0,0 +1,56 @@
+"""The tables every panel is drawn from, as functions of a Dataset and the panel's filters.
+
+app.py computes them on demand and caches them; precompute.py computes them
+for every filter combination ahead of time. Either way a panel is looked up
+by its name in PANELS and a key tuple of filter values.
+"""
+import charts
+from sankey import build_sankey
+
+
+def count(dataset, skill, state):
+    return dataset.index.count(skill=skill, state=state)
+
+
+def work_types(dataset, skill, state):
+    return dataset.cube.work_types(skill, state)
+
+
+def map_data(dataset, skill):
+    return charts.map_data(dataset.cube, skill)
+
+
+def sankey_data(dataset, state):
+    return build_sankey(dataset.cube, state)
+
+
+def company_bar_data(dataset, skill, state, work_type):
+    return charts.company_bar_data(dataset.cube, skill, state, work_type)
+
+
+def top_companies_data(dataset, skill, state):
+    return charts.top_companies_data(dataset.cube, skill, state)
+
+
+def salary_box_data(dataset, skill, box_stats_mode):
+    return charts.salary_box_data(dataset.index, skill, box_stats_mode)
+
+
+def sidebar_summary(dataset, skill, state):
+    return charts.sidebar_summary(dataset.cube, skill, state)
+
+
+PANELS = {
+    'count': count,
+    'work_types': work_types,
+    'map': map_data,
+    'sankey': sankey_data,
+    'company_bar': company_bar_data,
+    'top_companies': top_companies_data,
+    'salary_box': salary_box_data,
+    'sidebar': sidebar_summary,
+}
+
+
+def compute(dataset, panel, key):
+    return PANELS[panel](dataset, *key)
@@ -0,0 +1,65 @@
+import threading
+import time
+
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+
+class PanelPrefetch:
+    """Prepares the panels of one rerun on a shared thread pool and hands each its result.
+
+    A preparation is a function `prepare(record, *args)` returning what the
+    panel draws and filling `record` (rows, payload_bytes) for the profiler.
+    submit() starts one on the pool; result() waits for it and re-raises its
+    exception, if any. Anything not submitted in this rerun, such as a
+    fragment rerunning alone with new arguments, is prepared inline, so a
+    panel never picks up a result computed for other filters. Without a pool
+    every preparation runs inline.
+    """
+
+    def __init__(self, pool=None):
+        self.pool = pool
+        self._futures = {}
+        self._spans = []
+        self._lock = threading.Lock()
+
+    @property
+    def parallel(self):
+        return self.pool is not None
+
+    def _run(self, prepare, args):
+        record = {}
+        start = time.perf_counter()
+        try:
+            return prepare(record, *args), record
+        finally:
+            with self._lock:
+                self._spans.append((start, time.perf_counter()))
+
+    def _run_in_worker(self, ctx, prepare, args):
+        # Pool threads need the rerun's script run context to use st.cache_data.
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return self._run(prepare, args)
+
+    def submit(self, prepare, *args):
+        if self.pool is not None:
+            self._futures[(prepare, args)] = self.pool.submit(self._run_in_worker, get_script_run_ctx(), prepare, args)
+
+    def result(self, record, prepare, *args):
+        future = self._futures.pop((prepare, args), None)
+        if future is None:
+            value, prepared = self._run(prepare, args)
+        else:
+            value, prepared = future.result()
+        record.update(prepared)
+        return value
+
+    def stats(self):
+        """Wall time of the pooled preparations against the sum of their individual times."""
+        with self._lock:
+            spans = list(self._spans)
+        if self.pool is None or not spans:
+            return None
+        serial_ms = sum(end - start for start, end in spans) * 1000
+        wall_ms = (max(end for _, end in spans) - min(start for start, _ in spans)) * 1000
+        return {'panels': len(spans), 'serial_ms': round(serial_ms, 3), 'wall_ms': round(wall_ms, 3),
+                'saved_ms': round(serial_ms - wall_ms, 3)}
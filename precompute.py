@@ -0,0 +1,188 @@
+"""Precompute every panel's tables for every filter combination.
+
+    python precompute.py                       # writes DASHBOARD_PRECOMPUTED_PATH
+    python precompute.py --workers 8 --box-stats-mode server
+
+Every skill x state (x work type) combination the dashboard can show is
+computed across a process pool and written to a single pickle that app.py
+loads at startup; with it in place the app only touches the raw postings on
+a lookup the artifact doesn't cover. A table that fails to compute is left
+out and reported, and the app computes it live like any other missing one.
+The artifact records the format version and the size/mtime/hash of the data
+file (and the names of the ingested batches) it was built from, and is
+ignored once those change.
+"""
+import argparse
+import os
+import pickle
+import time
+from concurrent.futures import as_completed
+
+from constants import ordered_state_abbreviations, skills_ordered
+from data_loader import file_hash
+from dataset import load_dataset
+from panel_data import PANELS, compute
+from settings import BACKEND, BOX_STATS_MODE, DATA_PATH, INGEST_DIR, PRECOMPUTED_PATH
+
+# Bump whenever a panel function's output changes so old artifacts are ignored.
+ARTIFACT_FORMAT = 2
+
+_dataset = None
+
+
+def _init_worker(path, backend, ingest_dir):
+    global _dataset
+    _dataset = load_dataset(path, backend, ingest_dir)
+
+
+class _Collector:
+    """Computes tables on the worker's dataset and keeps them as (panel, key, value) triples.
+
+    A table that raises is kept out of `results` and noted in `failures`
+    instead, so one bad table doesn't cost the whole artifact; add() then
+    returns None.
+    """
+
+    def __init__(self):
+        self.results = []
+        self.failures = []
+
+    def add(self, panel, *key):
+        try:
+            value = compute(_dataset, panel, key)
+        except Exception as error:
+            self.failures.append((panel, key, f'{type(error).__name__}: {error}'))
+            return None
+        self.results.append((panel, key, value))
+        return value
+
+
+def _compute_skill(skill, box_stats_mode):
+    """Every table that depends on `skill`."""
+    tables = _Collector()
+    tables.add('map', skill)
+    tables.add('salary_box', skill, box_stats_mode)
+    tables.add('count', skill, None)
+    for state in ordered_state_abbreviations:
+        tables.add('count', skill, state)
+        tables.add('sidebar', skill, state)
+        work_types = tables.add('work_types', skill, state)
+        if work_types is None:
+            # The app works out this pair's company tables live, along with the work types.
+            continue
+        for work_type in work_types:
+            tables.add('company_bar', skill, state, work_type)
+        # The top companies chart only replaces the bar chart when no work type qualifies.
+        if not work_types:
+            tables.add('top_companies', skill, state)
+    return tables.results, tables.failures
+
+
+def _compute_states():
+    """The tables that don't depend on a skill."""
+    tables = _Collector()
+    tables.add('count', None, None)
+    for state in ordered_state_abbreviations:
+        tables.add('sankey', state)
+        tables.add('count', None, state)
+    return tables.results, tables.failures
+
+
+def source_fingerprint(path, batches):
+    stat = os.stat(path)
+    return {'path': path, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': file_hash(path),
+            'batches': list(batches)}
+
+
+def build_tables(path=DATA_PATH, backend=BACKEND, ingest_dir=INGEST_DIR, box_stats_mode=BOX_STATS_MODE, workers=None):
+    # Imported here because app.py imports this module: the first import of
+    # multiprocessing aliases the running __main__ as __mp_main__ for good, and
+    # under `streamlit run` that would be the first script run's namespace,
+    # keeping its dataset alive after the data file is replaced.
+    from concurrent.futures import ProcessPoolExecutor
+    # Load once here first so the Parquet caches are written before the workers read them.
+    dataset = load_dataset(path, backend, ingest_dir)
+    tables = {panel: {} for panel in PANELS}
+    failures = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(path, backend, ingest_dir)) as pool:
+        futures = [pool.submit(_compute_skill, skill, box_stats_mode) for skill in skills_ordered]
+        futures.append(pool.submit(_compute_states))
+        for future in as_completed(futures):
+            results, future_failures = future.result()
+            for panel, key, value in results:
+                tables[panel][key] = value
+            failures.extend(future_failures)
+    return tables, list(dataset.batches), failures
+
+
+class PanelTables:
+    """Precomputed panel tables for one version of the data."""
+
+    def __init__(self, tables, batches, version):
+        self.tables = tables
+        self.batches = tuple(batches)
+        # Same shape as Dataset.version, so caches keyed by it are shared.
+        self.version = version
+
+    def lookup(self, panel, key):
+        return self.tables[panel][key]
+
+
+def write_artifact(out_path, tables, source, box_stats_mode):
+    artifact = {'format': ARTIFACT_FORMAT, 'source': source, 'box_stats_mode': box_stats_mode,
+                'created': time.time(), 'tables': tables}
+    tmp_path = f'{out_path}.tmp'
+    with open(tmp_path, 'wb') as out:
+        pickle.dump(artifact, out, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, out_path)
+
+
+def artifact_mtime_ns(artifact_path=PRECOMPUTED_PATH):
+    return os.stat(artifact_path).st_mtime_ns if os.path.exists(artifact_path) else None
+
+
+def load_panel_tables(artifact_path=PRECOMPUTED_PATH, path=DATA_PATH):
+    """The artifact's tables if it was built from the current data file, else None.
+
+    As with the Parquet cache, a changed mtime alone doesn't invalidate the
+    artifact as long as the size and content hash still match.
+    """
+    try:
+        with open(artifact_path, 'rb') as artifact_file:
+            artifact = pickle.load(artifact_file)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+    source = artifact.get('source', {})
+    stat = os.stat(path)
+    if artifact.get('format') != ARTIFACT_FORMAT or source.get('size') != stat.st_size:
+        return None
+    if source.get('mtime_ns') != stat.st_mtime_ns and source.get('sha256') != file_hash(path):
+        return None
+    batches = source.get('batches', [])
+    return PanelTables(artifact['tables'], batches, (path, stat.st_mtime_ns, len(batches)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', default=DATA_PATH, help='postings file to precompute from')
+    parser.add_argument('--out', default=PRECOMPUTED_PATH)
+    parser.add_argument('--workers', type=int, help='worker processes (default: one per CPU)')
+    parser.add_argument('--box-stats-mode', choices=['client', 'server'], default=BOX_STATS_MODE,
+                        help="'server' stores only the box statistics, which keeps the artifact small")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    tables, batches, failures = build_tables(args.data, box_stats_mode=args.box_stats_mode, workers=args.workers)
+    write_artifact(args.out, tables, source_fingerprint(args.data, batches), args.box_stats_mode)
+    entries = sum(len(panel_tables) for panel_tables in tables.values())
+    print(f'{entries} tables in {time.perf_counter() - start:.1f}s, '
+          f'{os.path.getsize(args.out) / 1024 / 1024:.1f} MB -> {args.out}')
+    if failures:
+        print(f'{len(failures)} tables failed and were left out; the app computes them live:')
+        for panel, key, error in failures:
+            print(f'  {panel} {key}: {error}')
+
+
+if __name__ == '__main__':
+    main()
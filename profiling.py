@@ -0,0 +1,65 @@
+import json
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+import numpy as np
+
+HISTORY_SIZE = 1000
+
+# Wall times of the last HISTORY_SIZE runs of each section, across all sessions
+_history = defaultdict(lambda: deque(maxlen=HISTORY_SIZE))
+_lock = threading.Lock()
+
+
+class SectionTimer:
+    """Times named sections of one rerun.
+
+    Each section yields a record the caller can fill with `rows` (postings the
+    section covers) and `payload_bytes` (size of the figure JSON it sent).
+    Finished records are kept on the timer, added to the process-wide history
+    used for percentiles and appended to a JSON-lines log. When disabled the
+    sections still yield a record but nothing is measured or written.
+    """
+
+    def __init__(self, enabled=False, log_path=None):
+        self.enabled = enabled
+        self.log_path = log_path
+        self.run_id = uuid.uuid4().hex[:12]
+        self.records = []
+
+    @contextmanager
+    def section(self, name):
+        record = {'section': name, 'rows': None, 'payload_bytes': None}
+        if not self.enabled:
+            yield record
+            return
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['wall_ms'] = round((time.perf_counter() - start) * 1000, 3)
+            record['run_id'] = self.run_id
+            record['ts'] = time.time()
+            self._save(record)
+
+    def _save(self, record):
+        with _lock:
+            self.records.append(record)
+            _history[record['section']].append(record['wall_ms'])
+            if self.log_path:
+                with open(self.log_path, 'a') as log_file:
+                    log_file.write(json.dumps(record) + '\n')
+
+
+def section_percentiles():
+    with _lock:
+        history = {section: np.array(times) for section, times in _history.items()}
+    return [
+        {'section': section, 'runs': len(times),
+         'p50_ms': round(float(np.percentile(times, 50)), 3),
+         'p95_ms': round(float(np.percentile(times, 95)), 3)}
+        for section, times in history.items()
+    ]
@@ -0,0 +1,236 @@
+"""Render the dashboard's views for every skill x state pair to static files.
+
+    python render_static.py                               # everything into static_report/
+    python render_static.py --skills Sales --states CA NY --workers 4 --blinds-mode On
+
+Each pair gets <out>/<skill>/<state>.html, a standalone page with the
+sidebar statistics and every chart (one company chart per work type, Plotly
+loaded from its CDN), and <state>.json with the same figures as Plotly JSON.
+Skills are rendered in a process pool and each page is written by the worker
+as soon as it is built, so only the pages in flight are held in memory.
+
+A pair is skipped when the tables it is drawn from hash the same as in the
+previous run's <out>/manifest.json and its files are still there, so a rerun
+after new data only re-renders what changed. Tables come from the
+precomputed artifact when it is current (same data file and batches),
+otherwise from the postings. A pair whose tables can't be computed is
+reported and left out of the manifest, so the next run tries it again.
+"""
+import argparse
+import functools
+import hashlib
+import html
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+import charts
+from constants import ordered_state_abbreviations, skills_ordered
+from dataset import load_dataset
+from panel_data import compute
+from precompute import load_panel_tables
+from settings import BOX_STATS_MODE, DATA_PATH, PRECOMPUTED_PATH
+
+# Bump whenever the page layout or a figure function changes so every pair is re-rendered.
+RENDER_FORMAT = 2
+
+_tables = None
+_dataset = None
+_data_path = None
+
+
+def _init_worker(path, batches):
+    global _tables, _data_path
+    _data_path = path
+    _tables = load_panel_tables(PRECOMPUTED_PATH, path)
+    # As in app.py: an artifact built before the latest batches would mix stale tables with fresh ones.
+    if _tables is not None and _tables.batches != batches:
+        _tables = None
+
+
+def _panel(name, *key):
+    global _dataset
+    if _tables is not None:
+        try:
+            return _tables.lookup(name, key)
+        except KeyError:
+            pass
+    if _dataset is None:
+        _dataset = load_dataset(_data_path)
+    return compute(_dataset, name, key)
+
+
+def _canonical(value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.to_json(orient='split')
+    if isinstance(value, dict):
+        return {str(key): _canonical(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def fingerprint(*values):
+    """Content hash of panel tables, stable across processes and runs."""
+    payload = json.dumps(_canonical(list(values)), sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def slug(name):
+    return re.sub(r'[^A-Za-z0-9]+', '_', name).strip('_')
+
+
+def pair_paths(out_dir, skill, state):
+    base = os.path.join(out_dir, slug(skill), state)
+    return f'{base}.html', f'{base}.json'
+
+
+@functools.lru_cache(maxsize=64)
+def _sankey_figure(state, blinds_mode):
+    # Shared by every skill rendered in this worker.
+    return charts.sankey_figure(_panel('sankey', state), blinds_mode)
+
+
+def pair_views(skill, state, blinds_mode, map_fig, box_fig):
+    """(title, figure) for each chart of a pair, in dashboard order."""
+    views = [(charts.map_title(skill), map_fig),
+             (charts.sankey_title(skill, state), _sankey_figure(state, blinds_mode))]
+    work_types = _panel('work_types', skill, state)
+    for work_type in work_types:
+        views.append((charts.company_bar_title(skill, state, work_type),
+                      charts.company_bar_figure(_panel('company_bar', skill, state, work_type), blinds_mode)))
+    if not work_types:
+        views.append((charts.top_companies_title(skill),
+                      charts.top_companies_figure(_panel('top_companies', skill, state))))
+    views.append((charts.salary_box_title(skill), box_fig))
+    return views
+
+
+def page_html(skill, state, summary, views):
+    import plotly.io as pio
+    sidebar = ''.join(f'<h3>{html.escape(text)}</h3>' if kind == 'subheader' else f'<p>{html.escape(text)}</p>'
+                      for kind, text in charts.sidebar_lines(summary, skill, state))
+    sections = ''.join(f'<section><h5>{html.escape(title)}</h5>'
+                       f"{pio.to_html(fig, full_html=False, include_plotlyjs='cdn' if i == 0 else False)}</section>"
+                       for i, (title, fig) in enumerate(views))
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{html.escape(skill)} in {state}</title></head>'
+            f'<body><aside>{sidebar}</aside><main>{sections}</main></body></html>')
+
+
+def _write(path, text):
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as out:
+        out.write(text)
+    os.replace(tmp_path, path)
+
+
+def _error(error):
+    return f'{type(error).__name__}: {error}'
+
+
+def render_skill(skill, states, out_dir, blinds_mode, box_stats_mode, previous):
+    """Render one skill's pairs, writing each page as it is done.
+
+    Returns (state, digest, status, error) per pair. A pair whose tables or
+    figures raise has status 'failed', no digest and the error message; the
+    skill's other pairs are still rendered.
+    """
+    os.makedirs(os.path.join(out_dir, slug(skill)), exist_ok=True)
+    try:
+        skill_digest = fingerprint(RENDER_FORMAT, blinds_mode, skill, _panel('map', skill),
+                                   _panel('salary_box', skill, box_stats_mode))
+    except Exception as error:
+        return [(state, None, 'failed', _error(error)) for state in states]
+    map_fig = box_fig = None
+    results = []
+    for state in states:
+        try:
+            work_types = _panel('work_types', skill, state)
+            summary = _panel('sidebar', skill, state)
+            company_tables = ([_panel('company_bar', skill, state, work_type) for work_type in work_types]
+                              or [_panel('top_companies', skill, state)])
+            digest = fingerprint(skill_digest, state, summary, _panel('sankey', state), company_tables)
+            html_path, json_path = pair_paths(out_dir, skill, state)
+            if previous.get(state) == digest and os.path.exists(html_path) and os.path.exists(json_path):
+                results.append((state, digest, 'skipped', None))
+                continue
+
+            if map_fig is None:
+                map_fig = charts.map_figure(_panel('map', skill), blinds_mode)
+                box_fig = charts.salary_box_figure(_panel('salary_box', skill, box_stats_mode), blinds_mode)
+            views = pair_views(skill, state, blinds_mode, map_fig, box_fig)
+            _write(html_path, page_html(skill, state, summary, views))
+            _write(json_path, json.dumps({'skill': skill, 'state': state, 'summary': _canonical(summary),
+                                          'figures': [{'title': title, 'figure': json.loads(fig.to_json())}
+                                                      for title, fig in views]}))
+        except Exception as error:
+            results.append((state, None, 'failed', _error(error)))
+            continue
+        results.append((state, digest, 'rendered', None))
+    return results
+
+
+def read_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, 'manifest.json')) as manifest_file:
+            manifest = json.load(manifest_file)
+    except (OSError, ValueError):
+        return {}
+    return manifest.get('pairs', {}) if manifest.get('format') == RENDER_FORMAT else {}
+
+
+def write_manifest(out_dir, pairs):
+    _write(os.path.join(out_dir, 'manifest.json'), json.dumps({'format': RENDER_FORMAT, 'pairs': pairs}, indent=1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', default=DATA_PATH, help='postings file to render from')
+    parser.add_argument('--out', default='static_report')
+    parser.add_argument('--skills', nargs='+', default=skills_ordered)
+    parser.add_argument('--states', nargs='+', default=ordered_state_abbreviations)
+    parser.add_argument('--workers', type=int, help='worker processes (default: one per CPU)')
+    parser.add_argument('--blinds-mode', choices=['Off', 'On'], default='Off', help='colorblind palette')
+    parser.add_argument('--box-stats-mode', choices=['client', 'server'], default=BOX_STATS_MODE)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    os.makedirs(args.out, exist_ok=True)
+    pairs = read_manifest(args.out)
+    # Warm the Parquet cache once so the workers don't all parse the CSV.
+    batches = load_dataset(args.data).batches
+    counts = {'rendered': 0, 'skipped': 0, 'failed': 0}
+    failures = []
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                             initargs=(args.data, batches)) as pool:
+        futures = {pool.submit(render_skill, skill, args.states, args.out, args.blinds_mode, args.box_stats_mode,
+                               {state: pairs.get(f'{skill}|{state}') for state in args.states}): skill
+                   for skill in args.skills}
+        for future in as_completed(futures):
+            skill = futures[future]
+            for state, digest, status, error in future.result():
+                counts[status] += 1
+                if status == 'failed':
+                    # Forgotten so the next run tries it again.
+                    pairs.pop(f'{skill}|{state}', None)
+                    failures.append(f'  {skill} | {state}: {error}')
+                else:
+                    pairs[f'{skill}|{state}'] = digest
+            # Saved after every skill so an interrupted run keeps its progress.
+            write_manifest(args.out, pairs)
+            print(f'{skill}: done', flush=True)
+    print(f"{counts['rendered']} pairs rendered, {counts['skipped']} unchanged, {counts['failed']} failed, "
+          f'{time.perf_counter() - start:.1f}s -> {args.out}')
+    if failures:
+        print('\n'.join(['Failed pairs:'] + sorted(failures)))
+
+
+if __name__ == '__main__':
+    main()
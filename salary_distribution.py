@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+
+from constants import company_size_order
+
+APPLIES_CATEGORIES = ['No\nApplications', 'Average\nApplications', 'Above Average\nApplications']
+# The columns box_statistics() adds to the company size and applies category.
+BOX_STATISTICS = ['q1', 'median', 'q3', 'mean', 'lowerfence', 'upperfence']
+
+
+def stack_salaries(rows):
+    """One row per salary bound: each posting's min and max salary, next to its company size and applies."""
+    positions = np.repeat(np.arange(len(rows)), 2)
+    salaries = np.column_stack([
+        pd.to_numeric(rows['min_salary'], errors='coerce').to_numpy(dtype=float),
+        pd.to_numeric(rows['max_salary'], errors='coerce').to_numpy(dtype=float),
+    ]).ravel()
+    expanded = pd.DataFrame({
+        'company_size_label': rows['company_size_label'].iloc[positions].to_numpy(),
+        'salary': salaries,
+        'applies': pd.to_numeric(rows['applies'], errors='coerce').to_numpy(dtype=float)[positions],
+    })
+    expanded['company_size_label'] = pd.Categorical(
+        expanded['company_size_label'], categories=company_size_order, ordered=True)
+    return expanded.dropna(subset=['salary', 'applies'])
+
+
+def categorize_applies(applies, upper_quartile):
+    return np.select([applies == 0, applies <= upper_quartile], APPLIES_CATEGORIES[:2], default=APPLIES_CATEGORIES[2])
+
+
+def salary_distribution(rows, top_sizes=3):
+    """Salaries of the `top_sizes` best-paying company sizes, with applies bucketed.
+
+    Returns the expanded frame used by the salary box plot and the company
+    sizes it covers, in company size order. Applies are bucketed against the
+    75th percentile of the expanded rows: 0 applies, up to the percentile,
+    above it.
+    """
+    expanded = stack_salaries(rows)
+    top_company_sizes = expanded.groupby('company_size_label', observed=True)['salary'].max().nlargest(top_sizes).index
+    company_size_sorted = sorted(top_company_sizes, key=company_size_order.index)
+
+    expanded = expanded[expanded['company_size_label'].isin(company_size_sorted)]
+    applies = expanded['applies'].to_numpy()
+    upper_quartile = np.percentile(applies, 75) if applies.size else np.nan
+    expanded = expanded.assign(applies_category=categorize_applies(applies, upper_quartile))
+    return expanded, company_size_sorted
+
+
+def _quartiles(salaries):
+    return pd.Series(np.quantile(salaries, [0.25, 0.5, 0.75], method='hazen'), index=['q1', 'median', 'q3'])
+
+
+def box_statistics(expanded):
+    """Per (company size, applies category) box statistics of the expanded salaries.
+
+    These are the statistics plotly.js computes for a go.Box trace built from
+    raw points, so both box_stats_mode settings draw the same boxes. Its
+    default 'linear' quartile method interpolates at p * n - 0.5, which is
+    numpy's 'hazen' rather than pandas' quantile(). The fences are the most
+    extreme salaries within 1.5 IQR of the box, never inside it.
+    """
+    groups = ['company_size_label', 'applies_category']
+    if expanded.empty:
+        # No salaries at all: no boxes, as px.box draws for the same rows.
+        return pd.DataFrame(columns=groups + BOX_STATISTICS)
+    grouped = expanded.groupby(groups, observed=True)['salary']
+    stats = grouped.apply(_quartiles).unstack()
+    stats['mean'] = grouped.mean()
+
+    iqr = stats['q3'] - stats['q1']
+    bounds = expanded.join(pd.DataFrame({'low': stats['q1'] - 1.5 * iqr, 'high': stats['q3'] + 1.5 * iqr}), on=groups)
+    lowerfence = bounds['salary'].where(bounds['salary'] >= bounds['low']).groupby(
+        [bounds[column] for column in groups], observed=True).min()
+    upperfence = bounds['salary'].where(bounds['salary'] <= bounds['high']).groupby(
+        [bounds[column] for column in groups], observed=True).max()
+    stats['lowerfence'] = np.minimum(lowerfence, stats['q1'])
+    stats['upperfence'] = np.maximum(upperfence, stats['q3'])
+    return stats.reset_index()
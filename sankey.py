@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from constants import experience_levels
+
+SKILL_COLORS = {
+    'On': ['#dfc27d', '#80cdc1', '#f1b6da', '#b2abd2', '#ffffbf'],
+    'Off': ['#fbb4ae', '#b3cde3', '#ccebc5', '#decbe4', '#fed9a6'],
+    # 'Off': ['#D3F4FF', '#B2DFFB', '#B1E8ED', '#C6CBEF', '#CDFFEB'],
+}
+OTHER_NODE_COLOR = "rgba(0, 0, 0, 0.1)"  # Light grey for experience level nodes
+
+
+def build_sankey(cube, state, n_skills=5):
+    """Node and link arrays of the skill -> experience level Sankey for one state.
+
+    Nodes are the state's top skills followed by the experience levels they
+    lead to; links are indexed through categorical codes so nothing is looped
+    over row by row. Colours are applied separately by sankey_colors().
+    """
+    top_skills = cube.top_skills(state, n=n_skills)
+    skills_to_exp = cube.skill_experience_counts(state, top_skills)
+
+    present = set(skills_to_exp['formatted_experience_level'])
+    levels = [level for level in experience_levels if level in present]
+    levels += sorted(present.difference(levels))
+
+    source = pd.Categorical(skills_to_exp['skill_name'].astype(str), categories=top_skills).codes
+    target = len(top_skills) + pd.Categorical(
+        skills_to_exp['formatted_experience_level'].astype(str), categories=levels).codes
+    return {
+        'labels': top_skills + levels,
+        'skill_count': len(top_skills),
+        'source': source.tolist(),
+        'target': target.tolist(),
+        'value': skills_to_exp['count'].to_numpy().tolist(),
+    }
+
+
+def sankey_colors(sankey, blinds_mode):
+    skill_colors = np.array(SKILL_COLORS[blinds_mode][:sankey['skill_count']], dtype=object)
+    node_colors = skill_colors.tolist() + [OTHER_NODE_COLOR] * (len(sankey['labels']) - sankey['skill_count'])
+    link_colors = skill_colors[np.asarray(sankey['source'], dtype=int)].tolist()
+    return node_colors, link_colors
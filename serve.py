@@ -0,0 +1,25 @@
+"""Start the dashboard with its caches warmed up before the first request.
+
+    python serve.py [streamlit run options]
+
+Equivalent to `streamlit run app.py [options]`, except that startup.warm_up()
+runs first in the same process, so the first visitor doesn't pay for the
+data load.
+"""
+import os
+import sys
+
+import startup
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+
+
+def main():
+    startup.warm_up()
+    from streamlit.web import cli
+    sys.argv = ['streamlit', 'run', APP_PATH] + sys.argv[1:]
+    sys.exit(cli.main())
+
+
+if __name__ == '__main__':
+    main()
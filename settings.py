@@ -0,0 +1,42 @@
+import os
+
+# Everything here can be overridden from the environment so the same app.py
+# runs locally, in the devcontainer and on the servers.
+DATA_PATH = os.environ.get('DASHBOARD_DATA_PATH', 'main_df_subset.csv')
+CACHE_DIR = os.environ.get('DASHBOARD_CACHE_DIR', '.dashboard_cache')
+
+# 'client' ships every salary point to the browser and lets Plotly compute the
+# boxes; 'server' computes the quartiles/fences here and only sends those.
+BOX_STATS_MODE = os.environ.get('DASHBOARD_BOX_STATS_MODE', 'client')
+
+# Process-wide LRU of rendered figures/sidebar summaries shared by all sessions.
+FIGURE_CACHE_ENTRIES = int(os.environ.get('DASHBOARD_FIGURE_CACHE_ENTRIES', '512'))
+FIGURE_CACHE_MB = float(os.environ.get('DASHBOARD_FIGURE_CACHE_MB', '64'))
+# Panel tables computed live, across all data versions: a new batch or data
+# file starts a new version, so this bounds what the old ones leave behind.
+PANEL_CACHE_ENTRIES = int(os.environ.get('DASHBOARD_PANEL_CACHE_ENTRIES', '2048'))
+
+# Threads preparing the panels of a rerun concurrently (shared by all
+# sessions); 0 prepares them one after another as they are drawn.
+PANEL_WORKERS = int(os.environ.get('DASHBOARD_PANEL_WORKERS', '0'))
+
+# Per-section timings; also switched on per session with ?profile=1.
+PROFILE = os.environ.get('DASHBOARD_PROFILE', '').lower() in ('1', 'true', 'yes')
+PROFILE_LOG = os.environ.get('DASHBOARD_PROFILE_LOG', 'profile.jsonl')
+# One line per server process with its warm-up and time to first render.
+STARTUP_LOG = os.environ.get('DASHBOARD_STARTUP_LOG', 'startup.jsonl')
+
+# 'pandas' loads the postings into memory; 'duckdb' (pip install duckdb) keeps
+# them in a Parquet file and pushes every filter/aggregation down to DuckDB.
+# DASHBOARD_DATA_PATH may point at a CSV or directly at a Parquet file.
+BACKEND = os.environ.get('DASHBOARD_BACKEND', 'pandas')
+
+# Tables written by `python precompute.py`; used at startup when present and
+# built from the current data file.
+PRECOMPUTED_PATH = os.environ.get('DASHBOARD_PRECOMPUTED_PATH', 'precomputed.pkl')
+
+# Drop directory for append-only postings batches (CSV files with the same
+# columns as DASHBOARD_DATA_PATH); empty turns ingestion off. It is checked at
+# most every DASHBOARD_INGEST_POLL_SECONDS, including by idle sessions.
+INGEST_DIR = os.environ.get('DASHBOARD_INGEST_DIR', '')
+INGEST_POLL_SECONDS = float(os.environ.get('DASHBOARD_INGEST_POLL_SECONDS', '5'))
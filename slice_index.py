@@ -0,0 +1,134 @@
+import copy
+
+import numpy as np
+import pandas as pd
+
+from data_loader import concat_postings
+
+_EMPTY = np.array([], dtype=np.intp)
+_EMPTY.flags.writeable = False
+
+
+def _read_only(groups):
+    for positions in groups.values():
+        positions.flags.writeable = False
+    return groups
+
+
+def _categories(chunks):
+    """The dtype of each categorical column once the chunks are stacked, as concat_postings builds it."""
+    dtypes = {}
+    for column, dtype in chunks[0].dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            # Ordered categoricals have fixed categories; the others are merged.
+            if not dtype.ordered:
+                categories = dtype.categories
+                for chunk in chunks[1:]:
+                    categories = categories.union(chunk[column].cat.categories)
+                dtype = pd.CategoricalDtype(categories)
+            dtypes[column] = dtype
+    return dtypes
+
+
+def _recoding(chunk, dtypes):
+    """Per categorical column, where each of the chunk's codes goes in the merged categories."""
+    recoding = {}
+    for column, dtype in dtypes.items():
+        categories = chunk[column].cat.categories
+        if not categories.equals(dtype.categories):
+            # The extra slot maps the missing-value code -1 to itself.
+            recoding[column] = np.append(dtype.categories.get_indexer(categories), -1)
+    return recoding
+
+
+def _merge_positions(groups, added, offset):
+    merged = dict(groups)
+    for key, positions in added.items():
+        positions = positions + offset
+        merged[key] = np.concatenate([merged[key], positions]) if key in merged else positions
+    return _read_only(merged)
+
+
+class SliceIndex:
+    """Row positions of a frame grouped by skill, state and (skill, state).
+
+    Built once per loaded frame so every panel can take its slice with a dict
+    lookup and an iloc, instead of scanning the whole frame with a boolean mask.
+    extend() adds rows as further frames ("chunks") rather than a copy of
+    everything, with positions running on across them.
+
+    The frames are never handed out: rows() takes a new frame at the slice's
+    positions and the position arrays are read-only, so an index shared
+    between sessions can't be written through by any of them.
+    """
+
+    def __init__(self, df):
+        self._chunks = (df,)
+        self._starts = np.zeros(1, dtype=np.intp)
+        self._length = len(df)
+        self._by_skill = _read_only(df.groupby('skill_name', observed=True).indices)
+        self._by_state = _read_only(df.groupby('state', observed=True).indices)
+        self._by_skill_state = _read_only(df.groupby(['skill_name', 'state'], observed=True).indices)
+
+    def positions(self, skill=None, state=None):
+        if skill is not None and state is not None:
+            return self._by_skill_state.get((skill, state), _EMPTY)
+        if skill is not None:
+            return self._by_skill.get(skill, _EMPTY)
+        if state is not None:
+            return self._by_state.get(state, _EMPTY)
+        return np.arange(self._length)
+
+    def rows(self, skill=None, state=None):
+        positions = self.positions(skill, state)
+        if len(self._chunks) == 1:
+            return self._chunks[0].iloc[positions]
+        # Positions are sorted, so each chunk's share of them is one run.
+        parts = np.split(positions, np.searchsorted(positions, self._starts[1:]))
+        parts = [part - start for part, start in zip(parts, self._starts)]
+        columns = {}
+        for column in self._chunks[0].columns:
+            dtype = self._dtypes.get(column)
+            if dtype is None:
+                # compact_postings leaves only numeric columns besides the categoricals.
+                columns[column] = np.concatenate([chunk[column].to_numpy()[part]
+                                                  for chunk, part in zip(self._chunks, parts)])
+                continue
+            codes = []
+            for chunk, part, recoding in zip(self._chunks, parts, self._recodings):
+                chunk_codes = chunk[column].cat.codes.to_numpy()[part]
+                codes.append(recoding[column][chunk_codes] if column in recoding else chunk_codes)
+            columns[column] = pd.Categorical.from_codes(np.concatenate(codes), dtype=dtype, validate=False)
+        return pd.DataFrame(columns, index=positions)
+
+    def count(self, skill=None, state=None):
+        if skill is None and state is None:
+            return self._length
+        return len(self.positions(skill, state))
+
+    def extend(self, df):
+        """Return an index that also covers the postings in `df`, as the rows after count().
+
+        Only `df` is grouped, and the indexed frames are shared rather than
+        copied. So that rows() never has many chunks to stitch together, the
+        newest chunk is merged into the one before it while it is at least as
+        large; batch chunks then halve in size and only a logarithmic number
+        remain. The first chunk, the main data file, is never merged.
+        Categories are merged once here, so rows() only has to translate the
+        codes of the rows it takes.
+        """
+        offset = self._length
+        added = SliceIndex(df)
+        chunks = list(self._chunks) + [df]
+        while len(chunks) > 2 and len(chunks[-1]) >= len(chunks[-2]):
+            chunks[-2:] = [concat_postings(chunks[-2:])]
+        extended = copy.copy(self)
+        extended._chunks = tuple(chunks)
+        extended._dtypes = _categories(chunks)
+        extended._recodings = tuple(_recoding(chunk, extended._dtypes) for chunk in chunks)
+        extended._starts = np.cumsum([0] + [len(chunk) for chunk in chunks[:-1]])
+        extended._length = offset + len(df)
+        extended._by_skill = _merge_positions(self._by_skill, added._by_skill, offset)
+        extended._by_state = _merge_positions(self._by_state, added._by_state, offset)
+        extended._by_skill_state = _merge_positions(self._by_skill_state, added._by_skill_state, offset)
+        return extended
@@ -0,0 +1,88 @@
+"""Work done once per server process rather than on the first visitor's request.
+
+    python serve.py [streamlit run options]    # warm_up(), then streamlit run app.py
+
+The header image, the dataset and the precomputed panel tables are kept in
+process-wide caches that app.py reads through, so warm_up() can fill them
+before the server accepts a connection. record_first_render() logs how long
+the process took to get its first page out, one JSON line per process in
+DASHBOARD_STARTUP_LOG. Under plain `streamlit run app.py` nothing is warmed
+and the clock starts with the first script run instead of the process.
+"""
+import base64
+import functools
+import json
+import logging
+import os
+import threading
+import time
+
+# Taken before the project imports below, which pull in pandas.
+STARTED = time.time()
+
+from dataset import load_dataset
+from precompute import artifact_mtime_ns, load_panel_tables
+from settings import DATA_PATH, INGEST_DIR, PRECOMPUTED_PATH, STARTUP_LOG
+
+HEADER_IMAGE = 'linkedin.png'
+
+logger = logging.getLogger(__name__)
+_lock = threading.Lock()
+_warmup_ms = None
+_first_render = None
+
+
+@functools.lru_cache(maxsize=None)
+def header_image_uri(path=HEADER_IMAGE):
+    with open(path, 'rb') as image_file:
+        return 'data:image/png;base64,' + base64.b64encode(image_file.read()).decode()
+
+
+# One entry each: a new mtime means the file was replaced, and the previous
+# version's dataset would otherwise stay in memory for the life of the process.
+@functools.lru_cache(maxsize=1)
+def prepared_dataset(path, mtime_ns):
+    return load_dataset(path)
+
+
+@functools.lru_cache(maxsize=1)
+def prepared_panel_tables(path, mtime_ns, artifact_mtime_ns):
+    return load_panel_tables(PRECOMPUTED_PATH, path)
+
+
+def clear():
+    prepared_dataset.cache_clear()
+    prepared_panel_tables.cache_clear()
+
+
+def warm_up(path=DATA_PATH):
+    """Fill the caches above and import the plotting modules the first figures need."""
+    global _warmup_ms
+    start = time.perf_counter()
+    header_image_uri()
+    import plotly.express  # noqa: F401
+    import plotly.io  # noqa: F401
+    mtime_ns = os.stat(path).st_mtime_ns
+    # Same rule as app.py: the postings are only needed without a current artifact or with ingestion on.
+    if prepared_panel_tables(path, mtime_ns, artifact_mtime_ns()) is None or INGEST_DIR:
+        prepared_dataset(path, mtime_ns)
+    _warmup_ms = round((time.perf_counter() - start) * 1000, 1)
+    logger.info('Warmed up in %.0f ms', _warmup_ms)
+    return _warmup_ms
+
+
+def record_first_render():
+    """Log the time from startup to the end of the first script run, once per process."""
+    global _first_render
+    with _lock:
+        if _first_render is None:
+            _first_render = {'ts': time.time(), 'pid': os.getpid(), 'data_path': DATA_PATH,
+                             'warmed': _warmup_ms is not None, 'warmup_ms': _warmup_ms,
+                             'first_render_ms': round((time.time() - STARTED) * 1000, 1)}
+            logger.info('First render %.0f ms after startup', _first_render['first_render_ms'])
+            try:
+                with open(STARTUP_LOG, 'a') as log:
+                    log.write(json.dumps(_first_render) + '\n')
+            except OSError:
+                pass
+    return _first_render
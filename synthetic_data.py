@@ -0,0 +1,47 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from settings import DATA_PATH
+
+
+def scale_postings(df, factor, seed=0):
+    """Return `factor` times as many postings drawn from `df`.
+
+    Rows are resampled with replacement, so skill/state/company/work type
+    combinations keep their real frequencies; salaries are jittered by up to
+    +-10% and applies are redrawn around the original value so the box plot
+    doesn't just repeat the same points. Job ids are renumbered.
+    """
+    rng = np.random.default_rng(seed)
+    n = int(len(df) * factor)
+    scaled = df.iloc[rng.integers(0, len(df), n)].reset_index(drop=True)
+
+    jitter = rng.uniform(0.9, 1.1, n)
+    for column in ['min_salary', 'max_salary']:
+        if column in scaled:
+            scaled[column] = (scaled[column] * jitter).round(-2)
+    if 'applies' in scaled:
+        applies = scaled['applies']
+        scaled['applies'] = applies.where(applies.isna(), rng.poisson(applies.fillna(0).clip(lower=0)))
+    if 'job_id' in scaled:
+        scaled['job_id'] = np.arange(1, n + 1)
+    return scaled
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write a scaled-up copy of the postings CSV for benchmarking.')
+    parser.add_argument('--source', default=DATA_PATH)
+    parser.add_argument('--factor', type=float, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', required=True)
+    args = parser.parse_args()
+
+    scaled = scale_postings(pd.read_csv(args.source), args.factor, args.seed)
+    scaled.to_csv(args.out, index=False)
+    print(f'Wrote {len(scaled):,} postings to {args.out}')
+
+
+if __name__ == '__main__':
+    main()
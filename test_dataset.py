@@ -0,0 +1,143 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import SKILLS, STATES, make_postings
+from dataset import load_dataset
+
+
+def write_postings(path, seed, n):
+    make_postings(seed, n).to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture(params=['loaded', 'appended', 'duckdb'])
+def dataset(request, tmp_path):
+    path = write_postings(tmp_path / 'postings.csv', seed=1, n=200)
+    ingest_dir = tmp_path / 'ingest'
+    ingest_dir.mkdir()
+    batch_path = write_postings(ingest_dir / 'batch-001.csv', seed=2, n=40)
+    if request.param == 'loaded':
+        return load_dataset(path, backend='pandas', ingest_dir=str(ingest_dir))
+    if request.param == 'appended':
+        return load_dataset(path, backend='pandas', ingest_dir='').append(batch_path)
+    pytest.importorskip('duckdb')
+    return load_dataset(path, backend='duckdb', ingest_dir=str(ingest_dir))
+
+
+def answers(dataset):
+    """Everything a session can read from a shared dataset."""
+    index, cube = dataset.index, dataset.cube
+    read = {'version': dataset.version, 'batches': dataset.batches, 'row_count': dataset.row_count,
+            'rows': index.rows(), 'count': index.count()}
+    for skill in SKILLS:
+        read[skill] = [index.rows(skill=skill), index.count(skill=skill), cube.count(skill=skill),
+                       cube.state_job_counts(skill), cube.top_companies(skill), cube.salary_stats(skill)]
+        for state in STATES:
+            read[skill, state] = [index.rows(skill, state), cube.work_types(skill, state),
+                                  cube.company_experience_counts(skill, state, 'Full-time'),
+                                  cube.top_companies(skill, state), cube.salary_stats(skill, state)]
+    for state in STATES:
+        read[state] = [index.rows(state=state), cube.top_skills(state), cube.skill_experience_counts(state, SKILLS)]
+    return read
+
+
+def assert_same(actual, expected):
+    if isinstance(expected, pd.DataFrame):
+        pd.testing.assert_frame_equal(actual, expected)
+    elif isinstance(expected, pd.Series):
+        pd.testing.assert_series_equal(actual, expected)
+    elif isinstance(expected, dict):
+        assert actual.keys() == expected.keys()
+        for key in expected:
+            assert_same(actual[key], expected[key])
+    elif isinstance(expected, (list, tuple)):
+        assert len(actual) == len(expected)
+        for actual_item, expected_item in zip(actual, expected):
+            assert_same(actual_item, expected_item)
+    elif isinstance(expected, float) and math.isnan(expected):
+        assert math.isnan(actual)
+    else:
+        assert actual == expected
+
+
+def write_through(frame):
+    """In-place, .loc, .iloc and column writes into a frame a session was handed."""
+    column = frame.select_dtypes('number').columns[-1]
+    # A live view of a column makes Copy-on-Write copy on the write below
+    # rather than skip it, which is how writes used to reach shared frames.
+    held = frame[column]
+    frame.loc[frame.index[0], column] = -5
+    frame.iloc[0, 0] = frame.iloc[-1, 0]
+    frame.iloc[:, frame.columns.get_loc(column)] = 10 ** 6
+    frame[column] = 0
+    held.iloc[0] = -7
+    frame.drop(columns=frame.columns[0], inplace=True)
+
+
+def write_positions(index, skill=None, state=None):
+    # Only the pandas SliceIndex hands out row positions.
+    if hasattr(index, 'positions'):
+        with pytest.raises(ValueError):
+            index.positions(skill, state)[0] = 0
+
+
+def test_sessions_cannot_mutate_the_shared_dataset(dataset):
+    before = answers(dataset)
+    index, cube = dataset.index, dataset.cube
+
+    for skill in SKILLS:
+        for state in STATES:
+            write_through(index.rows(skill, state))
+            write_through(cube.company_experience_counts(skill, state, 'Full-time'))
+            cube.work_types(skill, state).clear()
+            write_positions(index, skill, state)
+        write_through(index.rows(skill=skill))
+        write_through(cube.state_job_counts(skill))
+        top_companies = cube.top_companies(skill)
+        top_companies.iloc[0] = 10 ** 6
+        top_companies.loc[top_companies.index[-1]] = -1
+        cube.salary_stats(skill)['job_count'] = 0
+        write_positions(index, skill=skill)
+    for state in STATES:
+        write_through(index.rows(state=state))
+        write_through(cube.skill_experience_counts(state, SKILLS))
+        cube.top_skills(state).clear()
+        write_positions(index, state=state)
+    write_through(index.rows())
+
+    for name in ['index', 'cube', 'batches', 'version', 'row_count']:
+        with pytest.raises(AttributeError):
+            setattr(dataset, name, None)
+
+    assert_same(answers(dataset), before)
+
+
+def test_no_public_attribute_exposes_mutable_data(dataset):
+    for shared in (dataset, dataset.index, dataset.cube):
+        for name in dir(shared):
+            if name.startswith('_'):
+                continue
+            value = getattr(shared, name)
+            assert callable(value) or not isinstance(
+                value, (pd.DataFrame, pd.Series, np.ndarray, list, dict, set)), f'{type(shared).__name__}.{name}'
+
+
+def test_appended_batches_answer_like_a_cold_load(tmp_path):
+    path = write_postings(tmp_path / 'postings.csv', seed=1, n=200)
+    ingest_dir = tmp_path / 'ingest'
+    ingest_dir.mkdir()
+    # Sizes chosen so some batch chunks get merged and some don't.
+    batch_paths = [write_postings(ingest_dir / f'batch-{i:03}.csv', seed=10 + i, n=n)
+                   for i, n in enumerate([40, 10, 10, 30, 5])]
+
+    base = load_dataset(path, backend='pandas', ingest_dir='')
+    appended = base
+    for batch_path in batch_paths:
+        appended = appended.append(batch_path)
+
+    assert_same(answers(appended), answers(load_dataset(path, backend='pandas', ingest_dir=str(ingest_dir))))
+    # Appending shares the postings already loaded instead of copying them.
+    assert appended.index._chunks[0] is base.index._chunks[0]
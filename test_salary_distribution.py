@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import charts
+from conftest import SKILLS, make_postings
+from constants import company_size_mapping
+from data_loader import add_derived_columns, compact_postings
+from salary_distribution import APPLIES_CATEGORIES, salary_distribution
+from slice_index import SliceIndex
+
+
+@pytest.fixture
+def postings():
+    return make_postings(seed=7, n=240, gaps=True)
+
+
+def box_plot_data(df, selected_skill_name):
+    """The chart data as app.py's box_plot built it before salary_distribution."""
+    df = df.copy()
+    df['company_size_label'] = df['company_size'].map(company_size_mapping)
+    filter_box = df[df['skill_name'] == selected_skill_name].copy()
+    filter_box['salary'] = df.apply(lambda row: [row['min_salary'], row['max_salary']], axis=1)
+    df_expanded = filter_box.explode('salary')
+    df_expanded['salary'] = pd.to_numeric(df_expanded['salary'], errors='coerce')
+    df_expanded['applies'] = pd.to_numeric(df_expanded['applies'], errors='coerce')
+    df_expanded = df_expanded.dropna(subset=['salary', 'applies'])
+
+    top_company_sizes = df_expanded.groupby('company_size_label')['salary'].max().nlargest(3).index.tolist()
+    company_size_sorted = sorted(top_company_sizes, key=lambda x: list(company_size_mapping.values()).index(x))
+
+    df_expanded = df_expanded[df_expanded['company_size_label'].isin(company_size_sorted)]
+
+    applies_description = df_expanded['applies'].describe()
+
+    def categorize_applies(x):
+        if x == 0:
+            return 'No\nApplications'
+        elif x <= applies_description['75%']:
+            return 'Average\nApplications'
+        else:
+            return 'Above Average\nApplications'
+    df_expanded['applies_category'] = df_expanded['applies'].apply(categorize_applies)
+    return df_expanded, company_size_sorted
+
+
+@pytest.mark.parametrize('skill', SKILLS)
+def test_salary_distribution_matches_box_plot(postings, skill):
+    expected, expected_sizes = box_plot_data(postings, skill)
+    index = SliceIndex(compact_postings(add_derived_columns(postings.copy())))
+    expanded, company_sizes = salary_distribution(index.rows(skill=skill))
+
+    assert company_sizes == expected_sizes
+    columns = ['company_size_label', 'salary', 'applies', 'applies_category']
+    pd.testing.assert_frame_equal(
+        expanded[columns].reset_index(drop=True).astype({'company_size_label': str, 'salary': float, 'applies': float}),
+        expected[columns].reset_index(drop=True).astype({'company_size_label': str, 'salary': float, 'applies': float}))
+    # The fixture has to exercise every bucket for the comparison to mean anything.
+    assert set(expanded['applies_category']) == {'No\nApplications', 'Average\nApplications',
+                                                 'Above Average\nApplications'}
+
+
+def plotly_box(values):
+    """q1, median, q3 and fences as plotly.js computes them for a box of raw points."""
+    values = np.sort(np.asarray(values, dtype=float))
+    n = len(values)
+
+    def interp(p):
+        # Lib.interp with the default 'linear' quartilemethod.
+        position = p * n - 0.5
+        if position < 0:
+            return values[0]
+        if position > n - 1:
+            return values[-1]
+        frac = position % 1
+        return frac * values[int(np.ceil(position))] + (1 - frac) * values[int(np.floor(position))]
+
+    q1, median, q3 = interp(0.25), interp(0.5), interp(0.75)
+    iqr = q3 - q1
+    lowerfence = min(q1, values[values >= q1 - 1.5 * iqr].min())
+    upperfence = max(q3, values[values <= q3 + 1.5 * iqr].max())
+    return q1, median, q3, lowerfence, upperfence
+
+
+@pytest.mark.parametrize('salaries', ['some', 'none'])
+def test_server_box_statistics_match_client_boxes(postings, salaries):
+    if salaries == 'none':
+        postings.loc[postings['skill_name'] == 'Sales', ['min_salary', 'max_salary']] = np.nan
+    index = SliceIndex(compact_postings(add_derived_columns(postings.copy())))
+    client = charts.salary_box_figure(charts.salary_box_data(index, 'Sales', 'client'), 'Off')
+    server = charts.salary_box_figure(charts.salary_box_data(index, 'Sales', 'server'), 'Off')
+
+    expected = {}
+    for trace in client.data:
+        x, y = np.asarray(trace.x), np.asarray(trace.y)
+        for size in np.unique(x):
+            expected[trace.name, size] = plotly_box(y[x == size])
+    drawn = {}
+    for trace in server.data:
+        assert trace.boxmean is False
+        for i, size in enumerate(trace.x):
+            drawn[trace.name, size] = (trace.q1[i], trace.median[i], trace.q3[i],
+                                       trace.lowerfence[i], trace.upperfence[i])
+
+    assert drawn.keys() == expected.keys()
+    # Without salaries both modes draw an empty chart rather than fail.
+    assert {name for name, _ in drawn} == (set(APPLIES_CATEGORIES) if salaries == 'some' else set())
+    for box, stats in expected.items():
+        np.testing.assert_allclose(drawn[box], stats, err_msg=str(box))